@@ -80,6 +80,7 @@ class Settings(BaseSettings):
     compression_enabled: bool = True
     compression_codec: str = "snappy"  # "snappy", "zstd", "gzip", "lz4"
     max_dataframe_size_mb: int = 500  # Protection against huge DFs
+    serialization_cache_enabled: bool = False  # Reuse bytes when sessions are created from DataFrames with identical content
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -52,6 +52,12 @@ class DataManager:
                     cls._instance._initialize_backend()
         return cls._instance
 
+    @classmethod
+    def _reset_singleton(cls) -> None:
+        """Drop the cached instance so the next DataManager() re-reads settings (tests only)."""
+        with cls._lock:
+            cls._instance = None
+
     def _initialize_backend(self) -> None:
         """
         Initialize storage backend based on configuration.
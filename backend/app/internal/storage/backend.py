@@ -3,7 +3,7 @@ Storage backend abstraction for DataFrame session management.
 Defines the interface that all storage implementations must follow.
 """
 
-from typing import Protocol, Dict, List, Optional
+from typing import Protocol, Dict, List, Optional, Tuple
 import pandas as pd
 
 
@@ -35,6 +35,15 @@ class StorageBackend(Protocol):
         """
         ...
 
+    def create_sessions_bulk(self, entries: List[Tuple[str, pd.DataFrame, str, int]]) -> None:
+        """
+        Create many sessions at once.
+
+        Args:
+            entries: ``(session_id, dataframe, filename, ttl_seconds)`` per session
+        """
+        ...
+
     def get_dataframe(self, session_id: str) -> pd.DataFrame:
         """
         Retrieve DataFrame for session, updating last_accessed and refreshing TTL.
@@ -50,6 +59,21 @@ class StorageBackend(Protocol):
         """
         ...
 
+    def get_dataframes_bulk(self, session_ids: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Retrieve several DataFrames at once, with get_dataframe semantics.
+
+        Args:
+            session_ids: Session identifiers (duplicates are read once)
+
+        Returns:
+            Dict[str, pd.DataFrame]: DataFrame for each session id
+
+        Raises:
+            SessionNotFoundException: If any session doesn't exist or expired
+        """
+        ...
+
     def update_dataframe(self, session_id: str, dataframe: pd.DataFrame) -> None:
         """
         Update the current DataFrame for a session.
@@ -87,6 +111,18 @@ class StorageBackend(Protocol):
         """
         ...
 
+    def sessions_exist_bulk(self, session_ids: List[str]) -> List[bool]:
+        """
+        Check several sessions at once.
+
+        Args:
+            session_ids: Session identifiers
+
+        Returns:
+            List[bool]: session_exists result for each id, in order
+        """
+        ...
+
     def touch_session(self, session_id: str, ttl_seconds: int) -> None:
         """
         Refresh TTL for a session (update expiration time).
@@ -147,6 +183,26 @@ class StorageBackend(Protocol):
         """
         ...
 
+    def batch_version_ops(
+        self,
+        session_id: str,
+        ops: List[Tuple[pd.DataFrame, str, pd.DataFrame]],
+        max_versions: int = 5
+    ) -> List[int]:
+        """
+        Apply several create_version + update_dataframe steps in one call.
+
+        Args:
+            session_id: Session identifier
+            ops: ``(snapshot, action_summary, updated)`` per step; ``snapshot``
+                is stored as a new version, then ``updated`` becomes current
+            max_versions: Maximum versions to keep (rolling window)
+
+        Returns:
+            List[int]: New version IDs, in order
+        """
+        ...
+
     def undo_last_change(self, session_id: str) -> pd.DataFrame:
         """
         Undo last operation by restoring previous version.
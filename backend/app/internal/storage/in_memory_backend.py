@@ -9,14 +9,16 @@ Storage Structure:
     - storage/temp/{temp_id}.pkl - Temporary multi-sheet Excel storage
 """
 
+import os
 import threading
 import pickle
 import json
 import shutil
 import re
+import tempfile
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 
 from app.core.config import settings
@@ -38,9 +40,13 @@ class InMemoryBackend:
     # CODE QUALITY: Compiled regex pattern for efficient audit log parsing
     _INITIAL_ROWS_PATTERN = re.compile(r'Initial rows:\s*(\d+)')
 
+    # PERFORMANCE: Sessions are guarded by a fixed array of locks keyed by id hash,
+    # so operations on different sessions rarely contend for the same lock
+    NUM_LOCK_SHARDS = 16
+
     def __init__(self):
-        """Initialize storage directories and thread lock."""
-        self._session_lock = threading.Lock()
+        """Initialize storage directories and sharded session locks."""
+        self._session_locks = [threading.Lock() for _ in range(self.NUM_LOCK_SHARDS)]
         self._initialize_storage()
 
     def _initialize_storage(self) -> None:
@@ -61,6 +67,10 @@ class InMemoryBackend:
 
     # ===== Private Helper Methods =====
 
+    def _lock_for(self, key: str) -> threading.Lock:
+        """Get the lock shard guarding a session or temp storage id."""
+        return self._session_locks[hash(key) % self.NUM_LOCK_SHARDS]
+
     def _get_session_dir(self, session_id: str) -> Path:
         """Get session directory path."""
         return self._sessions_dir / session_id
@@ -140,12 +150,21 @@ class InMemoryBackend:
         return None
 
     def _save_session_data(self, session_id: str, data: Dict) -> None:
-        """Save session data."""
+        """
+        Save session data.
+
+        Writes to a uniquely named temp file and renames it into place, so
+        readers (including other worker processes, which the shard locks do
+        not cover) never see a partially written pickle.
+        """
         current_path = self._get_session_current_path(session_id)
         current_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(current_path, 'wb') as f:
+        with tempfile.NamedTemporaryFile(
+            dir=current_path.parent, prefix=f"{current_path.name}.", suffix=".tmp", delete=False
+        ) as f:
             pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, current_path)
 
     def _load_metadata(self, session_id: str) -> Dict:
         """Load session metadata."""
@@ -220,7 +239,7 @@ class InMemoryBackend:
             "last_accessed": datetime.now(),
         }
 
-        with self._session_lock:
+        with self._lock_for(session_id):
             # Create session directory structure
             session_dir = self._get_session_dir(session_id)
             session_dir.mkdir(parents=True, exist_ok=True)
@@ -249,11 +268,16 @@ class InMemoryBackend:
 
         print(f"[DEBUG] ✓ Session created: {session_id}")
 
+    def create_sessions_bulk(self, entries: List[Tuple[str, pd.DataFrame, str, int]]) -> None:
+        """Create many sessions (one create_session per entry)."""
+        for session_id, dataframe, filename, ttl_seconds in entries:
+            self.create_session(session_id, dataframe, filename, ttl_seconds)
+
     def get_dataframe(self, session_id: str) -> pd.DataFrame:
         """Retrieve DataFrame for a given session ID."""
         print(f"[DEBUG] Getting dataframe for session: {session_id}")
 
-        with self._session_lock:
+        with self._lock_for(session_id):
             session_data = self._load_session_data(session_id)
 
             if session_data is None:
@@ -272,13 +296,20 @@ class InMemoryBackend:
             session_data["last_accessed"] = datetime.now()
             self._save_session_data(session_id, session_data)
 
-            return session_data["dataframe"].copy()
+            return session_data["dataframe"]
+
+    def get_dataframes_bulk(self, session_ids: List[str]) -> Dict[str, pd.DataFrame]:
+        """Retrieve several DataFrames (one get_dataframe per unique id)."""
+        return {
+            session_id: self.get_dataframe(session_id)
+            for session_id in dict.fromkeys(session_ids)
+        }
 
     def update_dataframe(self, session_id: str, dataframe: pd.DataFrame) -> None:
         """Update the DataFrame for an existing session."""
         print(f"[DEBUG] Updating dataframe for session: {session_id}")
 
-        with self._session_lock:
+        with self._lock_for(session_id):
             session_data = self._load_session_data(session_id)
 
             if session_data is None:
@@ -295,7 +326,7 @@ class InMemoryBackend:
         """Delete a session and all its versions."""
         print(f"[DEBUG] Deleting session: {session_id}")
 
-        with self._session_lock:
+        with self._lock_for(session_id):
             session_dir = self._get_session_dir(session_id)
 
             if session_dir.exists():
@@ -308,7 +339,7 @@ class InMemoryBackend:
     def session_exists(self, session_id: str) -> bool:
         """Check if a session exists and hasn't expired."""
         try:
-            with self._session_lock:
+            with self._lock_for(session_id):
                 session_data = self._load_session_data(session_id)
 
                 if session_data is None:
@@ -322,9 +353,13 @@ class InMemoryBackend:
         except Exception:
             return False
 
+    def sessions_exist_bulk(self, session_ids: List[str]) -> List[bool]:
+        """Check several sessions (one file read per session on disk)."""
+        return [self.session_exists(session_id) for session_id in session_ids]
+
     def touch_session(self, session_id: str, ttl_seconds: int) -> None:
         """Refresh TTL for a session (update expiration time)."""
-        with self._session_lock:
+        with self._lock_for(session_id):
             session_data = self._load_session_data(session_id)
 
             if session_data is None:
@@ -339,7 +374,7 @@ class InMemoryBackend:
 
     def get_metadata(self, session_id: str) -> Dict:
         """Get metadata for a session without retrieving the full DataFrame."""
-        with self._session_lock:
+        with self._lock_for(session_id):
             session_data = self._load_session_data(session_id)
 
             if session_data is None:
@@ -363,7 +398,7 @@ class InMemoryBackend:
 
     def update_metadata(self, session_id: str, metadata: Dict) -> None:
         """Update session metadata (merge with existing)."""
-        with self._session_lock:
+        with self._lock_for(session_id):
             meta = self._load_metadata(session_id)
 
             # Merge metadata
@@ -397,7 +432,7 @@ class InMemoryBackend:
         """
         print(f"[DEBUG] Creating version for session: {session_id}")
 
-        with self._session_lock:
+        with self._lock_for(session_id):
             # Ensure versions directory exists
             versions_dir = self._get_session_versions_dir(session_id)
             versions_dir.mkdir(parents=True, exist_ok=True)
@@ -434,6 +469,26 @@ class InMemoryBackend:
 
             return new_version
 
+    def batch_version_ops(
+        self,
+        session_id: str,
+        ops: List[Tuple[pd.DataFrame, str, pd.DataFrame]],
+        max_versions: int = 5
+    ) -> List[int]:
+        """
+        Apply several create_version + update_dataframe steps.
+
+        Runs the ops in order; each step takes the session's lock shard itself
+        (the locks are not reentrant, so it is not held across the batch).
+        """
+        new_versions = []
+        for snapshot, action_summary, updated in ops:
+            new_versions.append(
+                self.create_version(session_id, snapshot, action_summary, max_versions)
+            )
+            self.update_dataframe(session_id, updated)
+        return new_versions
+
     def undo_last_change(self, session_id: str) -> pd.DataFrame:
         """
         Undo last operation by restoring previous version.
@@ -449,7 +504,7 @@ class InMemoryBackend:
         """
         print(f"[DEBUG] Undoing last operation for session: {session_id}")
 
-        with self._session_lock:
+        with self._lock_for(session_id):
             meta = self._load_metadata(session_id)
 
             if meta["current_version"] == 0:
@@ -476,7 +531,7 @@ class InMemoryBackend:
 
             print(f"[DEBUG] ✓ Restored version {prev_version}")
 
-            return prev_data["dataframe"].copy()
+            return prev_data["dataframe"]
 
     def get_history(self, session_id: str) -> List[Dict]:
         """Get version history for session."""
@@ -492,7 +547,7 @@ class InMemoryBackend:
 
     def set_intentional_missing(self, session_id: str, column: str, row_indices: List[int]) -> None:
         """Set intentional missing values for a column."""
-        with self._session_lock:
+        with self._lock_for(session_id):
             meta = self._load_metadata(session_id)
 
             if "intentional_missing" not in meta:
@@ -512,7 +567,7 @@ class InMemoryBackend:
             session_id: Session identifier
             columns_data: Dictionary mapping column names to their row indices
         """
-        with self._session_lock:
+        with self._lock_for(session_id):
             meta = self._load_metadata(session_id)
 
             if "intentional_missing" not in meta:
@@ -619,14 +674,14 @@ class InMemoryBackend:
             "expires_at": expiration,
         }
 
-        with self._session_lock:
+        with self._lock_for(temp_id):
             temp_path = self._get_temp_path(temp_id)
             with open(temp_path, 'wb') as f:
                 pickle.dump(temp_data, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     def get_temp_storage(self, temp_id: str) -> Dict:
         """Retrieve temporary storage data."""
-        with self._session_lock:
+        with self._lock_for(temp_id):
             temp_path = self._get_temp_path(temp_id)
 
             if not temp_path.exists():
@@ -643,7 +698,7 @@ class InMemoryBackend:
 
     def delete_temp_storage(self, temp_id: str) -> bool:
         """Delete temporary storage file."""
-        with self._session_lock:
+        with self._lock_for(temp_id):
             temp_path = self._get_temp_path(temp_id)
 
             if temp_path.exists():
@@ -666,14 +721,14 @@ class InMemoryBackend:
         now = datetime.now()
         removed_count = 0
 
-        with self._session_lock:
-            # Find all session directories
-            for session_dir in self._sessions_dir.iterdir():
-                if not session_dir.is_dir():
-                    continue
+        # Find all session directories
+        for session_dir in self._sessions_dir.iterdir():
+            if not session_dir.is_dir():
+                continue
 
-                session_id = session_dir.name
+            session_id = session_dir.name
 
+            with self._lock_for(session_id):
                 # Try to load session data to check expiration
                 try:
                     session_data = self._load_session_data(session_id)
@@ -703,8 +758,8 @@ class InMemoryBackend:
         now = datetime.now()
         removed_count = 0
 
-        with self._session_lock:
-            for temp_file in self._temp_dir.glob("*.pkl"):
+        for temp_file in self._temp_dir.glob("*.pkl"):
+            with self._lock_for(temp_file.stem):
                 try:
                     # Check file modification time instead of loading pickle
                     file_mtime = datetime.fromtimestamp(temp_file.stat().st_mtime)
@@ -730,11 +785,11 @@ class InMemoryBackend:
         count = 0
         now = datetime.now()
 
-        with self._session_lock:
-            for session_dir in self._sessions_dir.iterdir():
-                if not session_dir.is_dir():
-                    continue
+        for session_dir in self._sessions_dir.iterdir():
+            if not session_dir.is_dir():
+                continue
 
+            with self._lock_for(session_dir.name):
                 try:
                     session_data = self._load_session_data(session_dir.name)
                     if session_data and now <= session_data.get("expires_at", now):
@@ -12,13 +12,17 @@ Key Structure:
     biometric:temp:{temp_id}               - Temporary storage
 """
 
+import hashlib
 import json
 import time
 import uuid
 import logging
 import re
+import threading
+import weakref
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 
 from app.core.config import settings
@@ -43,6 +47,11 @@ class RedisBackend:
     # Key prefix
     KEY_PREFIX = "biometric"
 
+    # Payloads kept by _serialize_new when settings.serialization_cache_enabled is on
+    SERIALIZATION_CACHE_SIZE = 8
+    _ser_cache: "OrderedDict[Tuple, Tuple[bytes, Dict]]" = OrderedDict()
+    _ser_cache_lock = threading.Lock()
+
     # Compiled regex for extracting initial row count from audit log
     _INITIAL_ROWS_PATTERN = re.compile(r'Initial rows:\s*(\d+)')
 
@@ -162,8 +171,137 @@ class RedisBackend:
         logger.debug(f"[RedisBackend] Refreshed TTL for {count} keys (session: {session_id})")
         return count
 
+    def _session_data_keys(self, session_id: str, metadata: Dict) -> List[str]:
+        """
+        Keys holding a session's DataFrames, derived from its metadata.
+
+        Covers the current DataFrame, the versions list and every snapshot
+        named in the history, so TTLs can be refreshed without a SCAN.
+        Snapshots already evicted are included; EXPIRE ignores missing keys.
+        """
+        keys = [self._key(session_id, "df:current"), self._key(session_id, "versions")]
+        keys.extend(
+            self._version_key(session_id, entry["version_id"])
+            for entry in metadata.get("history", [])
+        )
+        return keys
+
+    @staticmethod
+    def _serialize(dataframe: pd.DataFrame) -> Tuple[bytes, Dict]:
+        """Serialize a DataFrame for storage (single seam for all writes)."""
+        return DataFrameSerializer.serialize(dataframe)
+
+    @staticmethod
+    def _content_digest(dataframe: pd.DataFrame) -> bytes:
+        """
+        Digest of a DataFrame's values, index, column names and dtypes.
+
+        Raises TypeError for frames pandas cannot hash (e.g. list cells).
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(pd.util.hash_pandas_object(dataframe, index=True).to_numpy().tobytes())
+        digest.update(repr((list(dataframe.columns), list(map(str, dataframe.dtypes)))).encode())
+        return digest.digest()
+
+    @classmethod
+    def _evict_serialized(cls, key: Tuple) -> None:
+        """Drop a cached payload (called when the frame that added it is collected)."""
+        with cls._ser_cache_lock:
+            cls._ser_cache.pop(key, None)
+
+    @classmethod
+    def _serialize_new(cls, dataframe: pd.DataFrame) -> Tuple[bytes, Dict]:
+        """
+        Serialize a DataFrame that is being stored as a new session.
+
+        With ``settings.serialization_cache_enabled``, creating sessions from a
+        frame with the same content and serializer settings reuses the bytes.
+        The cache is keyed on a hash of the content, so a frame edited in
+        place is serialized again. An entry lives only as long as the frame
+        that added it, and at most SERIALIZATION_CACHE_SIZE are kept.
+        """
+        if not settings.serialization_cache_enabled:
+            return cls._serialize(dataframe)
+
+        try:
+            digest = cls._content_digest(dataframe)
+        except TypeError:
+            return cls._serialize(dataframe)
+
+        key = (
+            digest,
+            settings.serialization_method,
+            settings.compression_enabled,
+            settings.compression_codec,
+        )
+
+        with cls._ser_cache_lock:
+            entry = cls._ser_cache.get(key)
+            if entry is not None:
+                cls._ser_cache.move_to_end(key)
+                return entry[0], dict(entry[1])
+
+        df_bytes, ser_meta = cls._serialize(dataframe)
+
+        with cls._ser_cache_lock:
+            cls._ser_cache[key] = (df_bytes, dict(ser_meta))
+            cls._ser_cache.move_to_end(key)
+            while len(cls._ser_cache) > cls.SERIALIZATION_CACHE_SIZE:
+                cls._ser_cache.popitem(last=False)
+        weakref.finalize(dataframe, cls._evict_serialized, key)
+
+        return df_bytes, ser_meta
+
     # ===== Session Management =====
 
+    def _write_session(
+        self,
+        pipe,
+        session_id: str,
+        df_bytes: bytes,
+        ser_meta: Dict,
+        filename: str,
+        ttl_seconds: int
+    ) -> None:
+        """
+        Queue every write needed for a new session on ``pipe``.
+
+        The caller executes the pipeline, which lets several sessions share a
+        single round trip. The initial audit entry is written as part of the
+        metadata instead of through a separate read-modify-write.
+        """
+        shape = list(ser_meta["shape"])
+
+        # Create metadata
+        metadata = {
+            "session_id": session_id,
+            "filename": filename,
+            "created_at": datetime.now().isoformat(),
+            "expires_at": datetime.now().timestamp() + ttl_seconds,
+            "last_accessed": datetime.now().isoformat(),
+            "current_version": 0,
+            "history": [],
+            "intentional_missing": {},
+            "audit_log": [
+                self._timestamp_entry(
+                    f"Session created. Original file: '{filename}'. Initial rows: {shape[0]}"
+                )
+            ],
+            "shape": shape,
+            "columns": ser_meta["columns"],
+            "dtypes": ser_meta["dtypes"],
+            "serialization": ser_meta
+        }
+
+        meta_key = self._key(session_id, "meta")
+        df_key = self._key(session_id, "df:current")
+        versions_key = self._key(session_id, "versions")
+
+        pipe.set(meta_key, json.dumps(metadata), ex=ttl_seconds)
+        pipe.set(df_key, df_bytes, ex=ttl_seconds)
+        pipe.rpush(versions_key, 0)  # Version 0
+        pipe.expire(versions_key, ttl_seconds)
+
     def create_session(
         self,
         session_id: str,
@@ -176,52 +314,44 @@ class RedisBackend:
 
         try:
             # Serialize DataFrame
-            df_bytes, ser_meta = DataFrameSerializer.serialize(dataframe)
-
-            # Create metadata
-            metadata = {
-                "session_id": session_id,
-                "filename": filename,
-                "created_at": datetime.now().isoformat(),
-                "expires_at": datetime.now().timestamp() + ttl_seconds,
-                "last_accessed": datetime.now().isoformat(),
-                "current_version": 0,
-                "history": [],
-                "intentional_missing": {},
-                "audit_log": [],
-                "shape": list(dataframe.shape),
-                "columns": dataframe.columns.tolist(),
-                "dtypes": {col: str(dtype) for col, dtype in dataframe.dtypes.items()},
-                "serialization": ser_meta
-            }
-
-            # Save to Redis with TTL
-            meta_key = self._key(session_id, "meta")
-            df_key = self._key(session_id, "df:current")
-            versions_key = self._key(session_id, "versions")
+            df_bytes, ser_meta = self._serialize_new(dataframe)
 
             # Use pipeline for atomic operations
             pipe = self.redis.pipeline()
-            pipe.set(meta_key, json.dumps(metadata))
-            pipe.expire(meta_key, ttl_seconds)
-            pipe.set(df_key, df_bytes)
-            pipe.expire(df_key, ttl_seconds)
-            pipe.rpush(versions_key, 0)  # Version 0
-            pipe.expire(versions_key, ttl_seconds)
+            self._write_session(pipe, session_id, df_bytes, ser_meta, filename, ttl_seconds)
             pipe.execute()
 
-            # Add initial audit entry
-            self.add_audit_entry(
-                session_id,
-                f"Session created. Original file: '{filename}'. Initial rows: {len(dataframe)}"
-            )
-
             logger.info(f"[RedisBackend] ✓ Session created: {session_id}")
 
         except Exception as e:
             logger.error(f"[RedisBackend] Failed to create session: {e}")
             raise BiometricException(f"Failed to create session: {str(e)}", 500)
 
+    def create_sessions_bulk(self, entries: List[Tuple[str, pd.DataFrame, str, int]]) -> None:
+        """
+        Create many sessions in a single pipelined round trip.
+
+        Each distinct DataFrame object is serialized once, so entries that
+        share a frame also share its payload.
+        """
+        logger.debug(f"[RedisBackend] Creating {len(entries)} sessions")
+
+        try:
+            encoded: Dict[int, Tuple[bytes, Dict]] = {}
+            pipe = self.redis.pipeline(transaction=False)
+            for session_id, dataframe, filename, ttl_seconds in entries:
+                if id(dataframe) not in encoded:
+                    encoded[id(dataframe)] = self._serialize_new(dataframe)
+                df_bytes, ser_meta = encoded[id(dataframe)]
+                self._write_session(pipe, session_id, df_bytes, ser_meta, filename, ttl_seconds)
+            pipe.execute()
+
+            logger.info(f"[RedisBackend] ✓ Created {len(entries)} sessions")
+
+        except Exception as e:
+            logger.error(f"[RedisBackend] Failed to create sessions: {e}")
+            raise BiometricException(f"Failed to create sessions: {str(e)}", 500)
+
     def get_dataframe(self, session_id: str) -> pd.DataFrame:
         """Retrieve DataFrame for session, updating last_accessed."""
         logger.debug(f"[RedisBackend] Getting dataframe for session: {session_id}")
@@ -248,7 +378,7 @@ class RedisBackend:
             self._save_metadata(session_id, metadata)
             self._touch_keys(session_id, settings.redis_session_ttl_seconds)
 
-            return df.copy()
+            return df
 
         except SessionNotFoundException:
             raise
@@ -256,6 +386,55 @@ class RedisBackend:
             logger.error(f"[RedisBackend] Failed to get dataframe: {e}")
             raise BiometricException(f"Failed to get dataframe: {str(e)}", 500)
 
+    def get_dataframes_bulk(self, session_ids: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Retrieve several DataFrames with one pipelined read.
+
+        last_accessed and TTLs are refreshed as in get_dataframe, but in one
+        pipelined write: the keys to expire come from each session's
+        metadata, not a SCAN.
+        """
+        session_ids = list(dict.fromkeys(session_ids))
+        if not session_ids:
+            return {}
+
+        logger.debug(f"[RedisBackend] Getting {len(session_ids)} dataframes")
+
+        try:
+            # Metadata and DataFrame bytes for every session in one round trip
+            pipe = self.redis.pipeline(transaction=False)
+            for session_id in session_ids:
+                pipe.get(self._key(session_id, "meta"))
+                pipe.get(self._key(session_id, "df:current"))
+            replies = pipe.execute()
+            metas, payloads = replies[0::2], replies[1::2]
+
+            for session_id, meta_json, df_bytes in zip(session_ids, metas, payloads):
+                if not meta_json or not df_bytes:
+                    raise SessionNotFoundException(session_id)
+
+            dataframes = [DataFrameSerializer.deserialize(df_bytes) for df_bytes in payloads]
+
+            # Update last_accessed and refresh TTL
+            now = datetime.now().isoformat()
+            ttl_seconds = settings.redis_session_ttl_seconds
+            pipe = self.redis.pipeline(transaction=False)
+            for session_id, meta_json in zip(session_ids, metas):
+                metadata = json.loads(meta_json.decode())
+                metadata["last_accessed"] = now
+                pipe.set(self._key(session_id, "meta"), json.dumps(metadata), ex=ttl_seconds)
+                for key in self._session_data_keys(session_id, metadata):
+                    pipe.expire(key, ttl_seconds)
+            pipe.execute()
+
+            return dict(zip(session_ids, dataframes))
+
+        except SessionNotFoundException:
+            raise
+        except Exception as e:
+            logger.error(f"[RedisBackend] Failed to get dataframes: {e}")
+            raise BiometricException(f"Failed to get dataframes: {str(e)}", 500)
+
     def update_dataframe(self, session_id: str, dataframe: pd.DataFrame) -> None:
         """Update the current DataFrame for a session."""
         logger.debug(f"[RedisBackend] Updating dataframe for session: {session_id}")
@@ -266,7 +445,7 @@ class RedisBackend:
                 raise SessionNotFoundException(session_id)
 
             # Serialize DataFrame
-            df_bytes, ser_meta = DataFrameSerializer.serialize(dataframe)
+            df_bytes, ser_meta = self._serialize(dataframe)
 
             # Update DataFrame and metadata
             df_key = self._key(session_id, "df:current")
@@ -316,6 +495,13 @@ class RedisBackend:
         meta_key = self._key(session_id, "meta")
         return self.redis.exists(meta_key) > 0
 
+    def sessions_exist_bulk(self, session_ids: List[str]) -> List[bool]:
+        """Check several sessions in one pipelined round trip."""
+        pipe = self.redis.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.exists(self._key(session_id, "meta"))
+        return [count > 0 for count in pipe.execute()]
+
     def touch_session(self, session_id: str, ttl_seconds: int) -> None:
         """Refresh TTL for a session."""
         self._touch_keys(session_id, ttl_seconds)
@@ -333,10 +519,9 @@ class RedisBackend:
         return json.loads(meta_json.decode())
 
     def _save_metadata(self, session_id: str, metadata: Dict) -> None:
-        """Save session metadata to Redis."""
+        """Save session metadata to Redis (value and TTL in a single SET ... EX)."""
         meta_key = self._key(session_id, "meta")
-        self.redis.set(meta_key, json.dumps(metadata))
-        self.redis.expire(meta_key, settings.redis_session_ttl_seconds)
+        self.redis.set(meta_key, json.dumps(metadata), ex=settings.redis_session_ttl_seconds)
 
     def get_metadata(self, session_id: str) -> Dict:
         """Get session metadata without loading the full DataFrame."""
@@ -395,7 +580,7 @@ class RedisBackend:
             new_version = current_version + 1
 
             # Serialize current DataFrame as snapshot
-            df_bytes, ser_meta = DataFrameSerializer.serialize(dataframe)
+            df_bytes, ser_meta = self._serialize(dataframe)
 
             # Save version snapshot
             version_key = self._version_key(session_id, new_version)
@@ -436,6 +621,89 @@ class RedisBackend:
             # Always release lock
             self._release_lock(session_id, lock_value)
 
+    def batch_version_ops(
+        self,
+        session_id: str,
+        ops: List[Tuple[pd.DataFrame, str, pd.DataFrame]],
+        max_versions: int = 5
+    ) -> List[int]:
+        """
+        Apply several create_version + update_dataframe steps atomically.
+
+        Every frame is serialized once and all writes are sent in a single
+        MULTI/EXEC transaction under the session lock. Only the last
+        ``updated`` frame is written as the current DataFrame.
+        """
+        if not ops:
+            return []
+
+        logger.debug(f"[RedisBackend] Applying {len(ops)} version ops for session: {session_id}")
+
+        # Acquire lock
+        lock_value = self._acquire_lock(session_id)
+        if not lock_value:
+            raise BiometricException("Failed to acquire lock for versioning", 409)
+
+        try:
+            metadata = self._load_metadata(session_id)
+            versions_key = self._key(session_id, "versions")
+            existing_versions = [int(v) for v in self.redis.lrange(versions_key, 0, -1)]
+            ttl_seconds = settings.redis_session_ttl_seconds
+
+            pipe = self.redis.pipeline(transaction=True)
+
+            # Version snapshots
+            version = metadata.get("current_version", 0)
+            rows_before = metadata["shape"][0]
+            new_versions = []
+            for snapshot, action_summary, updated in ops:
+                version += 1
+                snapshot_bytes, _ = self._serialize(snapshot)
+                pipe.set(self._version_key(session_id, version), snapshot_bytes, ex=ttl_seconds)
+                metadata["history"].append({
+                    "version_id": version,
+                    "timestamp": datetime.now().isoformat(),
+                    "action_summary": action_summary,
+                    "rows_before": rows_before,
+                    "rows_after": len(snapshot)
+                })
+                new_versions.append(version)
+                rows_before = len(updated)
+
+            # Final current DataFrame
+            final_df = ops[-1][2]
+            df_bytes, ser_meta = self._serialize(final_df)
+            pipe.set(self._key(session_id, "df:current"), df_bytes, ex=ttl_seconds)
+
+            # Update versions list and enforce max_versions (keep only last N)
+            all_versions = existing_versions + new_versions
+            evicted = all_versions[:max(len(all_versions) - max_versions, 0)]
+            pipe.rpush(versions_key, *new_versions)
+            pipe.ltrim(versions_key, -max_versions, -1)
+            pipe.expire(versions_key, ttl_seconds)
+            if evicted:
+                pipe.delete(*[self._version_key(session_id, v) for v in evicted])
+
+            # Update metadata
+            metadata["current_version"] = version
+            metadata["last_accessed"] = datetime.now().isoformat()
+            metadata["shape"] = list(final_df.shape)
+            metadata["serialization"] = ser_meta
+            pipe.set(self._key(session_id, "meta"), json.dumps(metadata), ex=ttl_seconds)
+
+            pipe.execute()
+            self._touch_keys(session_id, ttl_seconds)
+
+            logger.info(
+                f"[RedisBackend] ✓ Created versions {new_versions[0]}-{new_versions[-1]} "
+                f"for session {session_id}"
+            )
+            return new_versions
+
+        finally:
+            # Always release lock
+            self._release_lock(session_id, lock_value)
+
     def undo_last_change(self, session_id: str) -> pd.DataFrame:
         """Undo last operation by restoring previous version."""
         logger.debug(f"[RedisBackend] Undoing last operation for session: {session_id}")
@@ -464,7 +732,7 @@ class RedisBackend:
 
             # Update current DataFrame
             df_key = self._key(session_id, "df:current")
-            df_bytes, ser_meta = DataFrameSerializer.serialize(df_restored)
+            df_bytes, ser_meta = self._serialize(df_restored)
             self.redis.set(df_key, df_bytes)
             self.redis.expire(df_key, settings.redis_session_ttl_seconds)
 
@@ -476,7 +744,7 @@ class RedisBackend:
             self._save_metadata(session_id, metadata)
 
             logger.info(f"[RedisBackend] ✓ Restored version {current_version} for session {session_id}")
-            return df_restored.copy()
+            return df_restored
 
         finally:
             # Always release lock
@@ -505,7 +773,12 @@ class RedisBackend:
         self._save_metadata(session_id, metadata)
 
     def set_intentional_missing_batch(self, session_id: str, columns_data: Dict[str, List[int]]) -> None:
-        """Set intentional missing values for multiple columns."""
+        """
+        Set intentional missing values for multiple columns.
+
+        All columns are merged into the metadata document and written back
+        with a single GET + SET EX, regardless of how many columns change.
+        """
         metadata = self._load_metadata(session_id)
 
         if "intentional_missing" not in metadata:
@@ -518,6 +791,12 @@ class RedisBackend:
 
     # ===== Audit Log =====
 
+    @staticmethod
+    def _timestamp_entry(entry: str) -> str:
+        """Prefix an audit log entry with the current timestamp."""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return f"[{timestamp}] {entry}"
+
     def add_audit_entry(self, session_id: str, entry: str) -> None:
         """Add an entry to the audit log."""
         try:
@@ -526,9 +805,7 @@ class RedisBackend:
             if "audit_log" not in metadata:
                 metadata["audit_log"] = []
 
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            timestamped_entry = f"[{timestamp}] {entry}"
-            metadata["audit_log"].append(timestamped_entry)
+            metadata["audit_log"].append(self._timestamp_entry(entry))
 
             self._save_metadata(session_id, metadata)
 
@@ -570,7 +847,7 @@ class RedisBackend:
             # Serialize all sheets
             serialized_sheets = {}
             for sheet_name, df in sheets_dict.items():
-                df_bytes, _ = DataFrameSerializer.serialize(df)
+                df_bytes, _ = self._serialize(df)
                 serialized_sheets[sheet_name] = df_bytes.hex()  # Store as hex string
 
             temp_data = {
@@ -662,11 +939,11 @@ class RedisBackend:
         start_time = time.time()
 
         try:
-            # Ping Redis
-            self.redis.ping()
-
-            # Get info
-            info = self.redis.info()
+            # Ping and fetch info in one round trip
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.ping()
+            pipe.info()
+            _, info = pipe.execute()
 
             latency_ms = (time.time() - start_time) * 1000
 
@@ -4,6 +4,7 @@ Provides a centralized Redis connection for the RedisBackend.
 """
 
 import logging
+import time
 from typing import Optional
 from urllib.parse import urlparse
 
@@ -21,6 +22,18 @@ except ImportError:
     logger.warning("[Redis] redis-py not installed. RedisBackend will not be available.")
 
 
+def _sanitize_url(url: str) -> str:
+    """Sanitize Redis URL for logging (hide password)."""
+    try:
+        parsed = urlparse(url)
+        if parsed.password:
+            sanitized = url.replace(parsed.password, "***")
+            return sanitized
+        return url
+    except Exception:
+        return url
+
+
 class RedisClient:
     """
     Singleton Redis client with connection pooling.
@@ -42,10 +55,23 @@ class RedisClient:
                 logger.error("[Redis] Cannot initialize: redis-py not available")
         return cls._instance
 
+    @classmethod
+    def _reset(cls) -> None:
+        """
+        Forget the singleton so the next RedisClient() builds a fresh one (tests only).
+
+        Existing pools are not closed: callers still holding the old instance keep working.
+        """
+        global _redis_client_instance
+        cls._instance = None
+        cls._pool = None
+        cls._client = None
+        _redis_client_instance = None
+
     def _initialize(self) -> None:
         """Initialize Redis connection pool."""
         try:
-            logger.info(f"[Redis] Initializing connection pool: {self._sanitize_url(settings.redis_url)}")
+            logger.info(f"[Redis] Initializing connection pool: {_sanitize_url(settings.redis_url)}")
 
             # Parse Redis URL to handle password properly
             parsed = urlparse(settings.redis_url)
@@ -82,18 +108,7 @@ class RedisClient:
             logger.error(f"[Redis] ✗ Failed to initialize: {e}")
             self._client = None
             self._pool = None
-            raise
-
-    def _sanitize_url(self, url: str) -> str:
-        """Sanitize Redis URL for logging (hide password)."""
-        try:
-            parsed = urlparse(url)
-            if parsed.password:
-                sanitized = url.replace(parsed.password, "***")
-                return sanitized
-            return url
-        except Exception:
-            return url
+            raise RuntimeError(f"Failed to connect to Redis: {e}") from e
 
     def get_client(self) -> "redis.Redis":
         """
@@ -154,6 +169,51 @@ class RedisClient:
             logger.error(f"[Redis] Failed to get info: {e}")
             return {}
 
+    def health_check(self) -> dict:
+        """
+        Check Redis reachability and collect basic server stats.
+
+        PING and INFO are sent in one pipeline, so the check costs a single
+        round trip; ``latency_ms`` covers that round trip.
+
+        Returns:
+            dict: status, reachable, latency_ms and redis_info (or error)
+        """
+        if not self.is_available():
+            return {
+                "status": "unhealthy",
+                "reachable": False,
+                "latency_ms": None,
+                "error": "Redis client not initialized",
+            }
+
+        start = time.perf_counter()
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.ping()
+            pipe.info()
+            _, info = pipe.execute()
+        except Exception as e:
+            logger.error(f"[Redis] Health check failed: {e}")
+            return {
+                "status": "unhealthy",
+                "reachable": False,
+                "latency_ms": None,
+                "error": str(e),
+            }
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        return {
+            "status": "healthy",
+            "reachable": True,
+            "latency_ms": round(latency_ms, 2),
+            "redis_info": {
+                "version": info.get("redis_version", "unknown"),
+                "used_memory_mb": info.get("used_memory", 0) / (1024 * 1024),
+                "connected_clients": info.get("connected_clients", 0),
+            },
+        }
+
     def get_memory_usage(self) -> int:
         """
         Get Redis memory usage in bytes.
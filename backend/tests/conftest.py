@@ -8,6 +8,8 @@ This module provides shared fixtures for all test suites:
 - Test sessions
 """
 
+import functools
+import hashlib
 import pytest
 import pandas as pd
 import numpy as np
@@ -22,78 +24,226 @@ sys.path.insert(0, str(backend_dir))
 
 # ===== Configuration =====
 
+# Prefix of the per-test Redis key namespaces (see ``test_namespace``)
+TEST_NAMESPACE_PREFIX = "t:"
+
+
+# Default Redis server has databases 0-15
+REDIS_MAX_DATABASES = 16
+
+
 def pytest_configure(config):
     """Configure pytest environment."""
     # Create logs directory
     logs_dir = Path(__file__).parent / "logs"
     logs_dir.mkdir(exist_ok=True)
 
+    # Copy-on-Write: defensive .copy() calls become lazy views, and tests
+    # must not rely on two frames sharing (or not sharing) memory.
+    pd.set_option("mode.copy_on_write", True)
+
+    _select_worker_redis_db()
+
+
+def _select_worker_redis_db() -> None:
+    """
+    Give each pytest-xdist worker its own Redis database.
+
+    gw0 uses db 1, gw1 uses db 2, and so on, so parallel workers never see
+    each other's keys. Must run before the RedisClient singleton connects.
+    Outside xdist the configured ``redis_url`` is left untouched.
+    """
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker_id:
+        return
+
+    db_index = int(worker_id[2:]) + 1
+    if db_index >= REDIS_MAX_DATABASES:
+        raise pytest.UsageError(
+            f"xdist worker {worker_id} needs Redis db {db_index}, but only "
+            f"{REDIS_MAX_DATABASES} databases are available; run with fewer workers"
+        )
+
+    from urllib.parse import urlparse
+    from app.core.config import settings
+
+    settings.redis_url = urlparse(settings.redis_url)._replace(path=f"/{db_index}").geturl()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Check for leaked test namespaces, then disconnect the shared Redis pool.
+
+    Every Redis test writes under a ``TEST_NAMESPACE_PREFIX`` namespace that
+    ``clean_redis`` removes on teardown; any key left behind means a test
+    escaped that cleanup, and the run is marked as failed.
+    """
+    redis_client_module = sys.modules.get("app.internal.storage.redis_client")
+    if not (redis_client_module and redis_client_module._redis_client_instance):
+        return
+
+    client = redis_client_module._redis_client_instance
+    if client.is_available():
+        leaked = list(client.get_client().scan_iter(match=f"{TEST_NAMESPACE_PREFIX}*", count=1000))
+        if leaked:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+            reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+            if reporter:
+                reporter.write_line(
+                    f"Redis namespace leak: {len(leaked)} test keys left behind "
+                    f"(e.g. {leaked[0]!r})",
+                    red=True
+                )
+
+    client.close()
+
 
 # ===== Fixtures: Sample DataFrames =====
 
+# Independent seed streams, one per consumer, so each fixture's data is the
+# same whichever fixtures were built before it (-k, ordering, xdist shards)
+_RNG_SEED, _SMALL_DF_SEED, _MEDIUM_DF_SEED, _LARGE_DF_SEED = np.random.SeedSequence(42).spawn(4)
+
+
 @pytest.fixture
+def rng() -> np.random.Generator:
+    """
+    Seeded random Generator, fresh for every test.
+
+    Use this instead of the legacy global ``np.random`` state.
+    """
+    return np.random.default_rng(_RNG_SEED)
+
+
+@pytest.fixture(scope="session")
 def small_df() -> pd.DataFrame:
     """
     Small DataFrame (10 rows × 3 columns) for fast tests.
+
+    Shared by the whole session; take a ``.copy()`` before mutating it.
     """
     return pd.DataFrame({
-        'id': range(1, 11),
-        'value': np.random.rand(10),
-        'category': ['A', 'B', 'C'] * 3 + ['A']
-    })
+        'id': np.arange(1, 11, dtype=np.int64),
+        'value': np.random.default_rng(_SMALL_DF_SEED).random(10),
+        'category': np.array(['A', 'B', 'C'] * 3 + ['A'], dtype=object)
+    }, copy=False)
+
+
+def _freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Consolidate a shared fixture DataFrame and mark its buffers read-only.
+
+    Consolidating once up front keeps later copies cheap (one block per
+    dtype), and read-only buffers make accidental in-place writes to a
+    session-scoped frame fail loudly instead of leaking into other tests.
+    """
+    df._consolidate_inplace()
+    for block in df._mgr.blocks:
+        block.values.setflags(write=False)
+    return df
+
+
+@pytest.fixture(scope="session")
+def _medium_df_master() -> pd.DataFrame:
+    """Build the shared medium DataFrame once per test session."""
+    rng = np.random.default_rng(_MEDIUM_DF_SEED)
+    return _freeze(pd.DataFrame({
+        f'col_{i}': rng.random(1000) for i in range(10)
+    }))
+
+
+@pytest.fixture(scope="session")
+def _large_df_master() -> pd.DataFrame:
+    """Build the shared large DataFrame once per test session."""
+    rng = np.random.default_rng(_LARGE_DF_SEED)
+    return _freeze(pd.DataFrame(
+        rng.random((10000, 50), dtype=np.float64),
+        columns=[f'col_{i}' for i in range(50)],
+        copy=False
+    ))
 
 
 @pytest.fixture
-def medium_df() -> pd.DataFrame:
+def medium_df(_medium_df_master) -> pd.DataFrame:
     """
     Medium DataFrame (1,000 rows × 10 columns) for realistic tests.
+
+    Shared and read-only; take a ``.copy()`` before mutating it.
     """
-    np.random.seed(42)
-    return pd.DataFrame({
-        f'col_{i}': np.random.rand(1000) for i in range(10)
-    })
+    return _medium_df_master
+
+
+@pytest.fixture(scope="session")
+def medium_df_hash(_medium_df_master) -> bytes:
+    """
+    BLAKE2b digest of medium_df's values.
+
+    Lets roundtrip tests compare one digest instead of every cell.
+    """
+    return hashlib.blake2b(_medium_df_master.to_numpy().tobytes(), digest_size=16).digest()
+
+
+@pytest.fixture(scope="session")
+def medium_df_deep_mem_mb(_medium_df_master) -> float:
+    """medium_df's deep memory usage in MB, measured once per session."""
+    return _medium_df_master.memory_usage(deep=True).sum() / (1024 * 1024)
 
 
 @pytest.fixture
-def large_df() -> pd.DataFrame:
+def large_df(_large_df_master) -> pd.DataFrame:
     """
     Large DataFrame (10,000 rows × 50 columns) for performance tests.
+
+    Shared and read-only; take a ``.copy()`` before mutating it.
     """
-    np.random.seed(42)
-    return pd.DataFrame({
-        f'col_{i}': np.random.rand(10000) for i in range(50)
-    })
+    return _large_df_master
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def df_with_nulls() -> pd.DataFrame:
     """
     DataFrame with missing values for null handling tests.
+
+    Shared by the whole session; take a ``.copy()`` before mutating it.
     """
     df = pd.DataFrame({
-        'a': [1, 2, np.nan, 4, 5],
-        'b': [np.nan, 2, 3, np.nan, 5],
-        'c': [1, 2, 3, 4, 5]
-    })
+        'a': np.array([1, 2, np.nan, 4, 5], dtype=np.float64),
+        'b': np.array([np.nan, 2, 3, np.nan, 5], dtype=np.float64),
+        'c': np.arange(1, 6, dtype=np.int64)
+    }, copy=False)
     return df
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def df_with_dtypes() -> pd.DataFrame:
     """
     DataFrame with multiple data types for dtype tests.
+
+    Shared by the whole session; take a ``.copy()`` before mutating it.
     """
     return pd.DataFrame({
-        'int_col': [1, 2, 3, 4, 5],
-        'float_col': [1.1, 2.2, 3.3, 4.4, 5.5],
-        'str_col': ['a', 'b', 'c', 'd', 'e'],
-        'bool_col': [True, False, True, False, True],
+        'int_col': np.arange(1, 6, dtype=np.int64),
+        'float_col': np.array([1.1, 2.2, 3.3, 4.4, 5.5], dtype=np.float64),
+        'str_col': np.array(['a', 'b', 'c', 'd', 'e'], dtype=object),
+        'bool_col': np.array([True, False, True, False, True], dtype=np.bool_),
         'datetime_col': pd.date_range('2024-01-01', periods=5)
-    })
+    }, copy=False)
 
 
 # ===== Fixtures: Redis =====
 
+@functools.cache
+def _redis_reachable() -> bool:
+    """Ping Redis once per session; False if redis-py is missing or the ping fails."""
+    try:
+        from app.internal.storage.redis_client import get_redis_client
+
+        client = get_redis_client()
+        return client.ping()
+    except Exception:
+        return False
+
+
 @pytest.fixture(scope="session")
 def redis_available() -> bool:
     """
@@ -102,49 +252,57 @@ def redis_available() -> bool:
     Returns:
         bool: True if Redis is reachable
     """
-    try:
-        from app.internal.storage.redis_client import get_redis_client
-
-        client = get_redis_client()
-        return client.ping()
-    except Exception:
-        return False
+    return _redis_reachable()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def redis_client():
     """
-    Get Redis client for tests (skip if not available).
+    Get the shared Redis client for tests.
+
+    RedisClient is a singleton over a single ConnectionPool, so every test
+    borrows connections from the same pool instead of reconnecting and
+    re-pinging. Tests using this fixture are marked ``redis`` and skipped
+    at collection when Redis is down; the pool is disconnected in
+    ``pytest_sessionfinish``.
     """
-    pytest.importorskip("redis")
+    from app.internal.storage.redis_client import get_redis_client
 
-    try:
-        from app.internal.storage.redis_client import get_redis_client
+    return get_redis_client()
 
-        client = get_redis_client()
-        if not client.ping():
-            pytest.skip("Redis not available")
 
-        yield client
+@pytest.fixture
+def test_namespace() -> str:
+    """
+    Unique Redis key namespace for a single test.
 
-    except Exception as e:
-        pytest.skip(f"Redis not available: {e}")
+    Prepended to RedisBackend.KEY_PREFIX so every key a test writes can be
+    found (and removed) without touching the rest of the database.
+    """
+    import uuid
+    return f"{TEST_NAMESPACE_PREFIX}{uuid.uuid4().hex}:"
+
+
+def _unlink_namespace(client, namespace: str) -> int:
+    """Delete every key under ``namespace`` using SCAN + a single UNLINK."""
+    keys = list(client.scan_iter(match=f"{namespace}*", count=1000))
+    if keys:
+        client.unlink(*keys)
+    return len(keys)
 
 
 @pytest.fixture
-def clean_redis(redis_client):
+def clean_redis(redis_client, test_namespace):
     """
-    Clean Redis database before and after test.
+    Remove the test's namespaced keys after the test.
 
-    WARNING: This flushes the entire database. Only use in test environment.
+    Namespaces are unique per test, so nothing needs clearing beforehand.
+    Only keys under ``test_namespace`` are deleted, so this is O(test keys)
+    instead of an O(database) FLUSHDB and is safe with parallel workers.
     """
-    # Clean before test
-    redis_client.get_client().flushdb()
-
     yield redis_client
 
-    # Clean after test
-    redis_client.get_client().flushdb()
+    _unlink_namespace(redis_client.get_client(), test_namespace)
 
 
 # ===== Fixtures: Storage Backends =====
@@ -169,14 +327,18 @@ def in_memory_backend():
 
 
 @pytest.fixture
-def redis_backend(clean_redis):
+def redis_backend(clean_redis, test_namespace, monkeypatch):
     """
     Create RedisBackend instance for testing (requires Redis).
+
+    All keys are written under the per-test ``test_namespace``.
     """
     pytest.importorskip("redis")
 
     from app.internal.storage.redis_backend import RedisBackend
 
+    monkeypatch.setattr(RedisBackend, "KEY_PREFIX", f"{test_namespace}{RedisBackend.KEY_PREFIX}")
+
     try:
         backend = RedisBackend()
         yield backend
@@ -184,18 +346,21 @@ def redis_backend(clean_redis):
         pytest.skip(f"Redis backend not available: {e}")
 
 
-@pytest.fixture(params=["inmemory", "redis"])
-def any_backend(request, in_memory_backend, redis_backend):
+@pytest.fixture(params=["inmemory", pytest.param("redis", marks=pytest.mark.redis)])
+def any_backend(request):
     """
     Parametrized fixture that runs tests on both backends.
 
     This allows writing backend-agnostic tests that verify
     both InMemoryBackend and RedisBackend behave identically.
+
+    Only the requested backend is resolved, so the ``inmemory`` variant
+    never touches Redis. The ``redis`` variant is marked ``redis`` and is
+    skipped at collection when Redis is down.
     """
     if request.param == "inmemory":
-        return in_memory_backend
-    elif request.param == "redis":
-        return redis_backend
+        return request.getfixturevalue("in_memory_backend")
+    return request.getfixturevalue("redis_backend")
 
 
 # ===== Fixtures: Test Sessions =====
@@ -269,46 +434,20 @@ def override_settings():
         setattr(settings, key, value)
 
 
-# ===== Fixtures: Performance Timing =====
+# ===== Fixtures: Concurrency =====
 
-@pytest.fixture
-def timer():
+@pytest.fixture(scope="session")
+def thread_pool():
     """
-    Timer fixture for performance tests.
-
-    Usage:
-        def test_performance(timer):
-            with timer("operation_name") as t:
-                # ... code to time ...
+    Thread pool shared by the concurrency tests.
 
-            assert t.elapsed_ms < 100, "Too slow"
+    Threads are started once per session instead of per test, so measured
+    throughput reflects backend work rather than thread startup.
     """
-    from contextlib import contextmanager
-    import time
-
-    class Timer:
-        def __init__(self, name: str = "operation"):
-            self.name = name
-            self.start_time = None
-            self.end_time = None
-            self.elapsed_ms = None
-
-        def __enter__(self):
-            self.start_time = time.time()
-            return self
-
-        def __exit__(self, *args):
-            self.end_time = time.time()
-            self.elapsed_ms = (self.end_time - self.start_time) * 1000
-            print(f"[TIMER] {self.name}: {self.elapsed_ms:.2f}ms")
-
-    @contextmanager
-    def _timer(name: str = "operation"):
-        t = Timer(name)
-        with t:
-            yield t
+    from concurrent.futures import ThreadPoolExecutor
 
-    return _timer
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        yield pool
 
 
 # ===== Helper Functions =====
@@ -326,23 +465,42 @@ def assert_dataframes_equal(df1: pd.DataFrame, df2: pd.DataFrame, check_dtype: b
 
 # ===== Pytest Hooks =====
 
+# Test directory name -> marker applied to every test collected under it
+_DIR_MARKERS = {
+    "unit": pytest.mark.unit,
+    "integration": pytest.mark.integration,
+    "load": pytest.mark.load,
+}
+
+# Fixtures that talk to a live Redis server
+_REDIS_FIXTURES = frozenset({"redis_available", "redis_client", "clean_redis", "redis_backend"})
+
+_SKIP_NO_REDIS = pytest.mark.skip(reason="Redis not available")
+
+
 def pytest_collection_modifyitems(config, items):
     """
     Automatically mark tests based on their location.
+
+    Tests marked ``redis`` are skipped here, before any fixture is set up,
+    when Redis cannot be reached. Redis is only pinged if such a test was
+    collected.
     """
     for item in items:
         # Add marker based on path
-        if "unit" in str(item.fspath):
-            item.add_marker(pytest.mark.unit)
-        elif "integration" in str(item.fspath):
-            item.add_marker(pytest.mark.integration)
-        elif "load" in str(item.fspath):
-            item.add_marker(pytest.mark.load)
+        parts = set(item.path.parts)
+        for kind, marker in _DIR_MARKERS.items():
+            if kind in parts:
+                item.add_marker(marker)
+                break
 
         # Add redis marker if test uses redis fixtures
-        if "redis" in item.fixturenames:
+        if not _REDIS_FIXTURES.isdisjoint(item.fixturenames):
             item.add_marker(pytest.mark.redis)
 
+        if item.get_closest_marker("redis") and not _redis_reachable():
+            item.add_marker(_SKIP_NO_REDIS)
+
 
 def pytest_report_header(config):
     """
@@ -4,7 +4,10 @@ End-to-end integration tests for full workflow.
 Tests complete user workflows from upload to processing.
 """
 
+import gc
+import hashlib
 import pytest
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 
@@ -13,7 +16,7 @@ class TestUploadWorkflow:
     """Tests for complete upload workflow."""
 
     @pytest.mark.integration
-    def test_upload_process_retrieve_workflow(self, any_backend, medium_df):
+    def test_upload_process_retrieve_workflow(self, any_backend, medium_df, medium_df_hash, rng):
         """
         Test complete workflow: upload → process → retrieve.
 
@@ -28,14 +31,19 @@ class TestUploadWorkflow:
 
         # 2. Retrieve DataFrame
         df_retrieved = any_backend.get_dataframe(session_id)
-        pd.testing.assert_frame_equal(medium_df, df_retrieved, check_dtype=False)
+        retrieved_hash = hashlib.blake2b(
+            df_retrieved[medium_df.columns].to_numpy().tobytes(), digest_size=16
+        ).digest()
+        if retrieved_hash != medium_df_hash:
+            # Digest mismatch: fall back to pandas for a readable diff
+            pd.testing.assert_frame_equal(medium_df, df_retrieved, check_dtype=False)
 
         # 3. Process (create version before modification)
         any_backend.create_version(session_id, df_retrieved, "Before cleaning")
 
         # 4. Modify DataFrame (simulate cleaning)
         df_modified = df_retrieved.copy()
-        df_modified["new_column"] = np.random.rand(len(df_modified))
+        df_modified["new_column"] = rng.random(len(df_modified))
 
         # 5. Update
         any_backend.update_dataframe(session_id, df_modified)
@@ -60,16 +68,15 @@ class TestUploadWorkflow:
         # Create session
         any_backend.create_session(session_id, small_df, "data.csv", ttl_seconds=300)
 
-        # Create 5 versions (max)
+        # Create 5 versions (max): snapshot before each modification
+        ops = []
+        df = small_df
         for i in range(5):
-            df = any_backend.get_dataframe(session_id)
+            modified = df.assign(**{f"col_{i}": range(len(df))})
+            ops.append((df, f"Version {i+1}", modified))
+            df = modified
 
-            # Create version before modifying
-            any_backend.create_version(session_id, df, f"Version {i+1}")
-
-            # Modify
-            df[f"col_{i}"] = range(len(df))
-            any_backend.update_dataframe(session_id, df)
+        any_backend.batch_version_ops(session_id, ops)
 
         # Verify history
         history = any_backend.get_history(session_id)
@@ -134,20 +141,20 @@ class TestConcurrentUsers:
         session_ids = [f"concurrent-{i}" for i in range(num_sessions)]
 
         try:
-            # Create 100 sessions
-            for session_id in session_ids:
-                any_backend.create_session(session_id, small_df, f"data_{session_id}.csv", ttl_seconds=300)
+            # Create 100 sessions in one batch
+            any_backend.create_sessions_bulk([
+                (session_id, small_df, f"data_{session_id}.csv", 300)
+                for session_id in session_ids
+            ])
 
             # Verify all exist
-            for session_id in session_ids:
-                assert any_backend.session_exists(session_id)
+            assert all(any_backend.sessions_exist_bulk(session_ids))
 
-            # Random operations on random sessions
+            # Read a random sample of sessions in one batch
             import random
-            for _ in range(50):
-                session_id = random.choice(session_ids)
-                df = any_backend.get_dataframe(session_id)
-                assert len(df) == len(small_df)
+            dfs = any_backend.get_dataframes_bulk(random.sample(session_ids, 50))
+            assert len(dfs) == 50
+            assert all(len(df) == len(small_df) for df in dfs.values())
 
         finally:
             # Cleanup
@@ -157,6 +164,31 @@ class TestConcurrentUsers:
                 except:
                     pass
 
+    @pytest.mark.integration
+    def test_bulk_read_refreshes_ttl(self, redis_backend, small_df):
+        """get_dataframes_bulk should refresh the TTL of every DataFrame key."""
+        from app.core.config import settings
+
+        session_id = "bulk-ttl"
+        redis_backend.create_session(session_id, small_df, "data.csv", ttl_seconds=300)
+        redis_backend.create_version(session_id, small_df, "Snapshot")
+
+        keys = [
+            redis_backend._key(session_id, "df:current"),
+            redis_backend._key(session_id, "versions"),
+            redis_backend._version_key(session_id, 1),
+        ]
+        for key in keys:
+            redis_backend.redis.expire(key, 10)
+
+        redis_backend.get_dataframes_bulk([session_id])
+
+        for key in keys:
+            assert redis_backend.redis.ttl(key) > settings.redis_session_ttl_seconds - 60
+
+        # Cleanup
+        redis_backend.delete_session(session_id)
+
 
 class TestDataIntegrity:
     """Tests for data integrity across operations."""
@@ -173,20 +205,11 @@ class TestDataIntegrity:
         df_retrieved = any_backend.get_dataframe(session_id)
 
         # Check values (allow dtype conversions)
-        for col in df_with_dtypes.columns:
-            if col == "datetime_col":
-                # Datetime might need special handling
-                pd.testing.assert_series_equal(
-                    df_with_dtypes[col],
-                    df_retrieved[col],
-                    check_dtype=False
-                )
-            else:
-                pd.testing.assert_series_equal(
-                    df_with_dtypes[col],
-                    df_retrieved[col],
-                    check_dtype=False
-                )
+        pd.testing.assert_frame_equal(
+            df_with_dtypes,
+            df_retrieved[df_with_dtypes.columns],
+            check_dtype=False
+        )
 
         # Cleanup
         any_backend.delete_session(session_id)
@@ -197,12 +220,6 @@ class TestDataIntegrity:
         """Test that null values are preserved correctly."""
         session_id = "nulls-test"
 
-        # Original null positions
-        original_nulls = {
-            col: df_with_nulls[col].isna().sum()
-            for col in df_with_nulls.columns
-        }
-
         # Create session
         any_backend.create_session(session_id, df_with_nulls, "nulls.csv", ttl_seconds=300)
 
@@ -210,13 +227,118 @@ class TestDataIntegrity:
         df_retrieved = any_backend.get_dataframe(session_id)
 
         # Check nulls preserved
-        for col in df_with_nulls.columns:
-            assert df_retrieved[col].isna().sum() == original_nulls[col]
+        assert (df_retrieved.isna().sum() == df_with_nulls.isna().sum()).all()
 
         # Cleanup
         any_backend.delete_session(session_id)
 
 
+class TestSerializationCache:
+    """Tests for RedisBackend's opt-in serialization cache."""
+
+    @pytest.fixture(autouse=True)
+    def cache_enabled(self, monkeypatch):
+        """Turn the cache on, starting empty, for every test in this class."""
+        from app.core.config import settings
+        from app.internal.storage.redis_backend import RedisBackend
+
+        monkeypatch.setattr(settings, "serialization_cache_enabled", True)
+        monkeypatch.setattr(RedisBackend, "_ser_cache", OrderedDict())
+
+    @pytest.mark.integration
+    def test_sessions_from_same_frame_serialize_once(self, redis_backend, small_df, monkeypatch):
+        """Creating two sessions from one frame should encode it once."""
+        from app.internal.storage.serializer import DataFrameSerializer
+
+        calls = []
+        serialize = DataFrameSerializer.serialize
+
+        def counting_serialize(df, *args, **kwargs):
+            calls.append(df)
+            return serialize(df, *args, **kwargs)
+
+        monkeypatch.setattr(DataFrameSerializer, "serialize", counting_serialize)
+        df = small_df.copy()
+
+        redis_backend.create_session("ser-cache-1", df, "data.csv", ttl_seconds=300)
+        redis_backend.create_session("ser-cache-2", df, "data.csv", ttl_seconds=300)
+
+        assert len(calls) == 1
+        pd.testing.assert_frame_equal(redis_backend.get_dataframe("ser-cache-2"), df)
+
+        # Cleanup
+        redis_backend.delete_session("ser-cache-1")
+        redis_backend.delete_session("ser-cache-2")
+
+    @pytest.mark.integration
+    def test_create_after_in_place_edit_stores_new_values(self, redis_backend, small_df):
+        """A frame edited in place (same shape) must not reuse its cached bytes."""
+        df = small_df.copy()
+        column = df.columns[0]
+
+        redis_backend.create_session("ser-cache-before", df, "data.csv", ttl_seconds=300)
+
+        df.loc[0, column] = 999
+        redis_backend.create_session("ser-cache-after", df, "data.csv", ttl_seconds=300)
+
+        assert redis_backend.get_dataframe("ser-cache-after").loc[0, column] == 999
+        assert redis_backend.get_dataframe("ser-cache-before").loc[0, column] == small_df.loc[0, column]
+
+        # Cleanup
+        redis_backend.delete_session("ser-cache-before")
+        redis_backend.delete_session("ser-cache-after")
+
+    @pytest.mark.integration
+    def test_create_after_new_column_stores_new_column(self, redis_backend, small_df):
+        """A frame that gains a column in place must be serialized again."""
+        df = small_df.copy()
+
+        redis_backend.create_session("ser-cache-before", df, "data.csv", ttl_seconds=300)
+
+        df["added"] = 1
+        redis_backend.create_session("ser-cache-after", df, "data.csv", ttl_seconds=300)
+
+        assert "added" in redis_backend.get_dataframe("ser-cache-after").columns
+
+        # Cleanup
+        redis_backend.delete_session("ser-cache-before")
+        redis_backend.delete_session("ser-cache-after")
+
+    @pytest.mark.integration
+    def test_entry_dropped_when_frame_collected(self, redis_backend, small_df):
+        """Cached bytes must not outlive the frame that produced them."""
+        from app.internal.storage.redis_backend import RedisBackend
+
+        df = small_df.copy()
+        redis_backend.create_session("ser-cache-gc", df, "data.csv", ttl_seconds=300)
+        assert len(RedisBackend._ser_cache) == 1
+
+        del df
+        gc.collect()
+        assert len(RedisBackend._ser_cache) == 0
+
+        # Cleanup
+        redis_backend.delete_session("ser-cache-gc")
+
+    @pytest.mark.integration
+    def test_update_after_in_place_edit_stores_new_values(self, redis_backend, small_df):
+        """update_dataframe must store an in-place edit made after create_session."""
+        session_id = "ser-cache-edit"
+        df = small_df.copy()
+        column = df.columns[0]
+
+        redis_backend.create_session(session_id, df, "data.csv", ttl_seconds=300)
+
+        # Same object and shape, different values
+        df.loc[0, column] = 999
+        redis_backend.update_dataframe(session_id, df)
+
+        assert redis_backend.get_dataframe(session_id).loc[0, column] == 999
+
+        # Cleanup
+        redis_backend.delete_session(session_id)
+
+
 class TestAuditAndMetadata:
     """Tests for audit logging and metadata."""
 
@@ -0,0 +1,29 @@
+"""
+Shared fixtures for load tests.
+"""
+
+import pytest
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+@pytest.fixture(scope="session", autouse=True)
+def arrow_return_pages_immediately():
+    """Have jemalloc hand freed pages back to the OS instead of caching them."""
+    if PYARROW_AVAILABLE:
+        try:
+            pa.jemalloc_set_decay_ms(0)
+        except NotImplementedError:
+            pass  # pyarrow built without jemalloc
+
+
+@pytest.fixture(autouse=True)
+def release_arrow_pool():
+    """Return buffers freed by the test to the OS so the next test starts clean."""
+    yield
+    if PYARROW_AVAILABLE:
+        pa.default_memory_pool().release_unused()
@@ -0,0 +1,45 @@
+"""
+Shared fixtures for unit tests.
+"""
+
+import pytest
+
+from app.internal.data_manager import DataManager
+from app.internal.storage.redis_client import RedisClient
+
+
+@pytest.fixture(autouse=True)
+def reset_data_manager():
+    """Give each unit test a fresh DataManager built from its own patched settings."""
+    DataManager._reset_singleton()
+    yield
+    DataManager._reset_singleton()
+
+
+@pytest.fixture
+def reset_redis_singleton():
+    """Start the test without a cached RedisClient and drop whatever it built."""
+    RedisClient._reset()
+    yield
+    RedisClient._reset()
+
+
+@pytest.fixture
+def fake_redis_server(monkeypatch):
+    """
+    Route RedisClient connections to an in-process fakeredis server.
+
+    Set ``connected = False`` on the returned server to simulate Redis being
+    down without paying for a real socket connect.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    import redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        "redis.ConnectionPool.from_url",
+        lambda *args, **kwargs: redis.ConnectionPool(
+            connection_class=fakeredis.FakeRedisConnection, server=server
+        ),
+    )
+    return server